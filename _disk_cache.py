@@ -0,0 +1,178 @@
+import atexit
+import os
+import shelve
+import threading
+import time
+from collections import OrderedDict
+
+# Backend chosen explicitly: shelve.open()'s default on Python 3.13 is
+# dbm.sqlite3, whose connection only works from the thread that opened it
+try:
+    import dbm.gnu as _dbm
+    _DB_SUFFIX = ".gdbm"
+except ImportError:
+    import dbm.dumb as _dbm
+    _DB_SUFFIX = ""
+
+# Returned by DiskCache.get() on a miss, so None can be cached as a value
+MISSING = object()
+
+# Writes between sweeps of expired / excess entries
+CULL_EVERY = 256
+
+
+# ============================
+# Persistent TTL Cache
+# ============================
+class DiskCache:
+    """
+    Small persistent key/value store built on shelve.
+
+    Entries expire after `ttl` seconds and are deleted when next read.
+    Every CULL_EVERY writes, expired entries are swept and, beyond
+    `max_entries`, the oldest are dropped, so the store stays bounded.
+    The most recent `memory_size` entries are also kept in an in-process
+    LRU so repeat lookups skip the disk. The store (gdbm, or dbm.dumb
+    where gdbm is missing) is opened once and access is serialized with
+    a lock, so one instance can be shared by worker threads. Any storage
+    error is treated as a cache miss; the cache must never break the
+    pipeline.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        memory_size: int = 0,
+        max_entries: int = 10000
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_failed = False
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        atexit.register(self.close)
+
+    def _open(self):
+        if self._db is None and not self._db_failed:
+            try:
+                store = _dbm.open(self.path + _DB_SUFFIX, "c")
+                self._db = shelve.Shelf(store)
+            except Exception:
+                # e.g. another process holds the file; run memory-only
+                self._db_failed = True
+
+        return self._db
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                try:
+                    self._db.close()
+                except Exception:
+                    pass
+                self._db = None
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        if self.memory_size <= 0:
+            return
+
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _expired(self, entry: tuple) -> bool:
+        return time.time() - entry[0] > self.ttl
+
+    def _cull(self, db) -> None:
+        entries = []
+
+        for key in list(db.keys()):
+            try:
+                entry = db[key]
+            except Exception:
+                entry = None
+
+            if entry is None or self._expired(entry):
+                del db[key]
+            else:
+                entries.append((entry[0], key))
+
+        excess = len(entries) - self.max_entries
+
+        if excess > 0:
+            entries.sort()
+
+            for _, key in entries[:excess]:
+                del db[key]
+                self._memory.pop(key, None)
+
+        # gdbm only reuses freed space after a reorganize
+        reorganize = getattr(db.dict, "reorganize", None)
+        if reorganize is not None:
+            reorganize()
+
+        db.sync()
+
+    def get(self, key: str, default=MISSING):
+        with self._lock:
+            entry = self._memory.get(key)
+
+            if entry is None:
+                db = self._open()
+                if db is None:
+                    return default
+
+                try:
+                    entry = db.get(key)
+                except Exception:
+                    return default
+
+                if entry is None:
+                    return default
+
+            if self._expired(entry):
+                self._memory.pop(key, None)
+
+                try:
+                    db = self._open()
+                    if db is not None and key in db:
+                        del db[key]
+                except Exception:
+                    pass
+
+                return default
+
+            self._remember(key, entry)
+
+        return entry[1]
+
+    def set(self, key: str, value) -> None:
+        entry = (time.time(), value)
+
+        with self._lock:
+            self._remember(key, entry)
+
+            db = self._open()
+            if db is None:
+                return
+
+            try:
+                db[key] = entry
+                self._writes += 1
+
+                if self._writes % CULL_EVERY == 0:
+                    self._cull(db)
+            except Exception:
+                pass
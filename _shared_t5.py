@@ -0,0 +1,114 @@
+import functools
+import os
+import torch
+from transformers import T5Tokenizer, T5ForConditionalGeneration
+
+# ============================
+# Device Selection
+# ============================
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+# Half precision on GPU (bf16 where supported); CPU stays fp32
+if DEVICE == "cuda":
+    DTYPE = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+else:
+    DTYPE = torch.float32
+
+# ============================
+# Shared Flan-T5 (Modules 1 & 2)
+# ============================
+MODEL_NAME = "google/flan-t5-small"
+
+# Optional ONNX Runtime export of MODEL_NAME (see README); unset = PyTorch
+T5_ONNX_PATH = os.getenv("T5_ONNX_PATH")
+
+# Opt-in torch.compile of the forward pass on GPU (T5_COMPILE=1, see README)
+T5_COMPILE = os.getenv("T5_COMPILE", "0") == "1"
+
+
+@functools.lru_cache(maxsize=None)
+def get_t5():
+    """
+    Load the Flan-T5 tokenizer and model once per process.
+
+    Returns:
+        tuple: (tokenizer, model) already moved to DEVICE in eval mode
+    """
+
+    tokenizer = T5Tokenizer.from_pretrained(MODEL_NAME)
+
+    if T5_ONNX_PATH:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+        model = ORTModelForSeq2SeqLM.from_pretrained(
+            T5_ONNX_PATH,
+            provider=(
+                "CUDAExecutionProvider" if DEVICE == "cuda"
+                else "CPUExecutionProvider"
+            )
+        )
+
+        return tokenizer, model
+
+    # torch_dtype (rather than .half()) keeps T5's "wo" layers in fp32,
+    # which avoids the known fp16 overflow in the feed-forward blocks
+    model = T5ForConditionalGeneration.from_pretrained(
+        MODEL_NAME,
+        torch_dtype=DTYPE
+    )
+    model.to(DEVICE)
+    model.eval()
+
+    if T5_COMPILE and DEVICE == "cuda" and hasattr(torch, "compile"):
+        # generate() calls model.forward, so compile that; compiling the
+        # module itself would leave generate() running eagerly
+        model.forward = torch.compile(model.forward, mode="reduce-overhead")
+
+        # Compile the first graph at load time; new batch shapes and
+        # sequence lengths still recompile on their first request
+        warmup = tokenizer(["Warm up."], return_tensors="pt").to(DEVICE)
+
+        with torch.inference_mode():
+            model.generate(**warmup, max_length=8, num_beams=4)
+
+    return tokenizer, model
+
+
+# Prompts per generate() call
+BATCH_SIZE = 16
+
+
+def generate_batch(prompts: list[str]) -> list[str]:
+    """
+    Run Flan-T5 over prompts in padded batches.
+
+    Returns:
+        list[str]: One decoded output per prompt, in input order
+    """
+
+    tokenizer, model = get_t5()
+    decoded_outputs = []
+
+    for start in range(0, len(prompts), BATCH_SIZE):
+        inputs = tokenizer(
+            prompts[start:start + BATCH_SIZE],
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=256
+        ).to(DEVICE)
+
+        with torch.inference_mode():
+            outputs = model.generate(
+                **inputs,
+                max_length=128,
+                num_beams=4,
+                early_stopping=True,
+                pad_token_id=tokenizer.pad_token_id
+            )
+
+        decoded_outputs.extend(
+            tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        )
+
+    return decoded_outputs
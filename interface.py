@@ -1,5 +1,4 @@
 import gradio as gr
-import time
 import traceback
 
 # ============================
@@ -32,12 +31,13 @@ def process_text(paragraph: str):
             yield "No claims extracted.", "", "", "", "", ""
             return
 
-        extracted_text = ""
+        parts = []
         for item in claims_list:
-            extracted_text += f"[{item['claim_id']}] {item['claim']}\n\n"
+            parts.append(f"[{item['claim_id']}] {item['claim']}\n\n")
 
-        yield extracted_text.strip(), "", "", "", "", ""
-        time.sleep(0.3)
+        extracted_text = "".join(parts).strip()
+
+        yield extracted_text, "", "", "", "", ""
 
         # =====================================================
         # STEP 2: Claim Simplification
@@ -47,106 +47,104 @@ def process_text(paragraph: str):
         for c, s in zip(claims_list, simplified_list):
             c["simplified_claim"] = s["simplified_claim"]
 
-        simplified_text = ""
+        parts = []
         for item in simplified_list:
-            simplified_text += (
+            parts.append(
                 f"[{item['claim_id']}]\n"
                 f"Original: {item['original_claim']}\n"
                 f"Simplified: {item['simplified_claim']}\n\n"
             )
 
-        yield extracted_text.strip(), simplified_text.strip(), "", "", "", ""
-        time.sleep(0.3)
+        simplified_text = "".join(parts).strip()
+
+        yield extracted_text, simplified_text, "", "", "", ""
 
         # =====================================================
         # STEP 3: Debatability
         # =====================================================
         debatability_results = classify_debatability(claims_list)
 
-        debatability_text = ""
+        parts = []
         for item in debatability_results:
-            debatability_text += (
+            parts.append(
                 f"[{item['claim_id']}]\n"
                 f"Claim: {item['claim']}\n"
                 f"Label: {item['label']}\n\n"
             )
 
-        yield extracted_text.strip(), simplified_text.strip(), debatability_text.strip(), "", "", ""
-        time.sleep(0.3)
+        debatability_text = "".join(parts).strip()
+
+        yield extracted_text, simplified_text, debatability_text, "", "", ""
 
         # =====================================================
         # STEP 4: Web Retrieval
         # =====================================================
         retrieved_results = retrieve_evidence_chunks(debatability_results)
 
-        scraped_text = ""
+        parts = []
 
         for item in retrieved_results:
             if item["label"] == "debatable":
 
-                scraped_text += f"\n========== Claim {item['claim_id']} ==========\n"
-                scraped_text += f"Claim: {item['claim']}\n\n"
+                parts.append(f"\n========== Claim {item['claim_id']} ==========\n")
+                parts.append(f"Claim: {item['claim']}\n\n")
 
                 chunks = item.get("evidence_chunks", [])
 
                 if not chunks:
-                    scraped_text += "No evidence retrieved.\n\n"
+                    parts.append("No evidence retrieved.\n\n")
                     continue
 
                 for chunk in chunks:
-                    scraped_text += f"Source: {chunk.get('source')}\n"
-                    scraped_text += f"Content:\n{chunk.get('content')[:300]}...\n"
-                    scraped_text += "-" * 80 + "\n\n"
+                    parts.append(f"Source: {chunk.get('source')}\n")
+                    parts.append(f"Content:\n{chunk.get('content')[:300]}...\n")
+                    parts.append("-" * 80 + "\n\n")
 
-        if not scraped_text.strip():
-            scraped_text = "No web content retrieved."
+        scraped_text = "".join(parts).strip() or "No web content retrieved."
 
         yield (
-            extracted_text.strip(),
-            simplified_text.strip(),
-            debatability_text.strip(),
-            scraped_text.strip(),
+            extracted_text,
+            simplified_text,
+            debatability_text,
+            scraped_text,
             "",
             ""
         )
-        time.sleep(0.3)
 
         # =====================================================
         # STEP 5: FILTER
         # =====================================================
         filtered_results = filter_and_rank_evidence(retrieved_results)
 
-        filtered_text = ""
+        parts = []
 
         for item in filtered_results:
 
-            filtered_text += f"\n========== Claim {item['claim_id']} ==========\n"
-            filtered_text += f"Claim: {item['claim']}\n\n"
+            parts.append(f"\n========== Claim {item['claim_id']} ==========\n")
+            parts.append(f"Claim: {item['claim']}\n\n")
 
             evidence = item.get("filtered_evidence", [])
 
             if not evidence:
-                filtered_text += "No strong evidence found.\n\n"
+                parts.append("No strong evidence found.\n\n")
                 continue
 
             for e in evidence:
-                filtered_text += f"- {e['content'][:200]}...\n"
-                filtered_text += f"  Source: {e['source']}\n\n"
+                parts.append(f"- {e['content'][:200]}...\n")
+                parts.append(f"  Source: {e['source']}\n\n")
 
-            filtered_text += "=" * 80 + "\n"
+            parts.append("=" * 80 + "\n")
 
-        if not filtered_text.strip():
-            filtered_text = "No filtered evidence available."
+        filtered_text = "".join(parts).strip() or "No filtered evidence available."
 
         yield (
-            extracted_text.strip(),
-            simplified_text.strip(),
-            debatability_text.strip(),
-            scraped_text.strip(),
-            filtered_text.strip(),
+            extracted_text,
+            simplified_text,
+            debatability_text,
+            scraped_text,
+            filtered_text,
             ""
         )
-        time.sleep(0.3)
 
         # =====================================================
         # STEP 6: LLM STREAMING (FINAL FIXED)
@@ -159,11 +157,11 @@ def process_text(paragraph: str):
                 final_text = update["text"]
 
                 yield (
-                    extracted_text.strip(),
-                    simplified_text.strip(),
-                    debatability_text.strip(),
-                    scraped_text.strip(),
-                    filtered_text.strip(),
+                    extracted_text,
+                    simplified_text,
+                    debatability_text,
+                    scraped_text,
+                    filtered_text,
                     final_text.strip()
                 )
 
@@ -172,11 +170,11 @@ def process_text(paragraph: str):
                 # No overwrite, no extra formatting
 
                 yield (
-                    extracted_text.strip(),
-                    simplified_text.strip(),
-                    debatability_text.strip(),
-                    scraped_text.strip(),
-                    filtered_text.strip(),
+                    extracted_text,
+                    simplified_text,
+                    debatability_text,
+                    scraped_text,
+                    filtered_text,
                     final_text.strip()
                 )
 
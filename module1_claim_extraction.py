@@ -1,33 +1,42 @@
 import re
-import torch
 import nltk
-from transformers import T5Tokenizer, T5ForConditionalGeneration
+from _shared_t5 import generate_batch, get_t5
 
 # Ensure NLTK sentence tokenizer is available
 nltk.download("punkt", quiet=True)
 
+# Resolve the English Punkt model once instead of on every sent_tokenize()
+try:
+    from nltk.tokenize import PunktTokenizer
+except ImportError:  # NLTK < 3.9 ships pickled Punkt models
+    _SENT_TOKENIZER = nltk.data.load("tokenizers/punkt/english.pickle")
+else:
+    nltk.download("punkt_tab", quiet=True)
+    _SENT_TOKENIZER = PunktTokenizer("english")
+
 # ============================
-# Device Selection
+# Load Model & Tokenizer (shared with Module 2)
 # ============================
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+get_t5()
 
 # ============================
-# Load Model & Tokenizer
+# Precompiled Patterns
 # ============================
-MODEL_NAME = "google/flan-t5-small"
-
-tokenizer = T5Tokenizer.from_pretrained(MODEL_NAME)
-model = T5ForConditionalGeneration.from_pretrained(MODEL_NAME)
-model.to(DEVICE)
-model.eval()
+_WHITESPACE = re.compile(r"\s+")
+_SPACE_BEFORE_PUNCT = re.compile(r"\s+([.,;:!?])")
+_MISSING_SPACE_AFTER_PUNCT = re.compile(r"([.,;:!?])([A-Za-z])")
+_CLAIM_SPLIT = re.compile(r"[.;]")
+_ALPHA = re.compile(r"[A-Za-z]")
+_NUMERIC_ONLY = re.compile(r"[\d\s.%]+")
+_NUMBER = re.compile(r"\d+\.?\d*%?")
 
 # ============================
 # Text Preprocessing Function
 # ============================
 def _preprocess_text(text: str) -> str:
-    text = re.sub(r"\s+", " ", text).strip()
-    text = re.sub(r"\s+([.,;:!?])", r"\1", text)
-    text = re.sub(r"([.,;:!?])([A-Za-z])", r"\1 \2", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    text = _SPACE_BEFORE_PUNCT.sub(r"\1", text)
+    text = _MISSING_SPACE_AFTER_PUNCT.sub(r"\1 \2", text)
     return text
 
 # ============================
@@ -38,45 +47,29 @@ def extract_claims(paragraph: str) -> list[dict]:
         return []
 
     paragraph = _preprocess_text(paragraph)
-    sentences = nltk.sent_tokenize(paragraph)
-
-    extracted_claims = []
-    seen_claims = set()
-    claim_id = 1
+    sentences = [s.strip() for s in _SENT_TOKENIZER.tokenize(paragraph)]
+    sentences = [s for s in sentences if len(s) >= 15]
 
-    for sentence in sentences:
-        sentence = sentence.strip()
-
-        if len(sentence) < 15:
-            continue
+    if not sentences:
+        return []
 
-        prompt = (
-            "Extract factual claims from the following sentence. "
-            "Return the claim text only:\n"
-            f"{sentence}"
-        )
+    prompts = [
+        "Extract factual claims from the following sentence. "
+        "Return the claim text only:\n"
+        f"{sentence}"
+        for sentence in sentences
+    ]
 
-        inputs = tokenizer(
-            prompt,
-            return_tensors="pt",
-            truncation=True,
-            max_length=256
-        ).to(DEVICE)
+    decoded_outputs = generate_batch(prompts)
 
-        with torch.no_grad():
-            outputs = model.generate(
-                **inputs,
-                max_length=128,
-                num_beams=4,
-                early_stopping=True
-            )
+    extracted_claims = []
+    seen_claims = set()
+    claim_id = 1
 
-        decoded_output = tokenizer.decode(
-            outputs[0],
-            skip_special_tokens=True
-        )
+    for sentence, decoded_output in zip(sentences, decoded_outputs):
 
-        candidate_claims = re.split(r"[.;]", decoded_output)
+        candidate_claims = _CLAIM_SPLIT.split(decoded_output)
+        orig_numbers = _NUMBER.findall(sentence)
 
         for claim in candidate_claims:
             claim = claim.strip()
@@ -85,16 +78,15 @@ def extract_claims(paragraph: str) -> list[dict]:
                 continue
 
             # Require alphabetic content
-            if len(re.findall(r"[A-Za-z]", claim)) < 5:
+            if len(_ALPHA.findall(claim)) < 5:
                 continue
 
             # Drop numeric-only fragments
-            if re.fullmatch(r"[\d\s.%]+", claim):
+            if _NUMERIC_ONLY.fullmatch(claim):
                 continue
 
             # ✅ NUMERIC CONSISTENCY FIX
-            orig_numbers = re.findall(r"\d+\.?\d*%?", sentence)
-            claim_numbers = re.findall(r"\d+\.?\d*%?", claim)
+            claim_numbers = _NUMBER.findall(claim)
 
             if orig_numbers and len(claim_numbers) < len(orig_numbers):
                 claim = sentence
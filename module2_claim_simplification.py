@@ -1,20 +1,20 @@
 
 
-import torch
 import re
 import spacy
 import wikipediaapi
-from transformers import T5Tokenizer, T5ForConditionalGeneration
-
-# ============================
-# Device Selection
-# ============================
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+from concurrent.futures import ThreadPoolExecutor
+from _disk_cache import DiskCache, MISSING
+from _shared_t5 import generate_batch, get_t5
 
 # ============================
 # Load SpaCy NER Model
 # ============================
-nlp = spacy.load("en_core_web_sm")
+# Only NER is used; the other components are skipped on every doc
+nlp = spacy.load(
+    "en_core_web_sm",
+    disable=["tagger", "parser", "attribute_ruler", "lemmatizer"]
+)
 
 # ============================
 # Load Wikipedia API
@@ -25,20 +25,59 @@ wiki = wikipediaapi.Wikipedia(
     extract_format=wikipediaapi.ExtractFormat.WIKI
 )
 
+# Summaries (including misses) persist across runs for a day
+WIKI_CACHE_TTL = 86400
+_wiki_cache = DiskCache(
+    ".cache/wikipedia",
+    ttl=WIKI_CACHE_TTL,
+    memory_size=1024
+)
+
+# Concurrent Wikipedia lookups per simplify_claims() call
+WIKI_MAX_WORKERS = 8
+
+# Simplified claims per spaCy batch
+NER_BATCH_SIZE = 32
+
+# Entity types worth enriching with a definition
+ENTITY_LABELS = {
+    "PERSON",
+    "ORG",
+    "GPE",
+    "LOC",
+    "EVENT",
+    "WORK_OF_ART"
+}
+
+# Precompiled patterns for summary cleanup
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
 # ============================
-# Load Flan-T5 Model
+# Load Flan-T5 Model (shared with Module 1)
 # ============================
-MODEL_NAME = "google/flan-t5-small"
-
-tokenizer = T5Tokenizer.from_pretrained(MODEL_NAME)
-model = T5ForConditionalGeneration.from_pretrained(MODEL_NAME)
-model.to(DEVICE)
-model.eval()
+get_t5()
 
 # ============================
 # Wikipedia Summary Fetcher
 # ============================
 def _get_wikipedia_summary(entity_text: str) -> str | None:
+    """
+    Cached wrapper around _fetch_wikipedia_summary.
+    Checks the in-process LRU first, then the on-disk cache.
+    """
+
+    cached = _wiki_cache.get(entity_text)
+    if cached is not MISSING:
+        return cached
+
+    summary = _fetch_wikipedia_summary(entity_text)
+    _wiki_cache.set(entity_text, summary)
+
+    return summary
+
+
+def _fetch_wikipedia_summary(entity_text: str) -> str | None:
     """
     Fetch a short Wikipedia definition for an entity.
     Returns 1–2 complete sentences.
@@ -55,10 +94,10 @@ def _get_wikipedia_summary(entity_text: str) -> str | None:
         return None
 
     # Normalize whitespace
-    summary = re.sub(r"\s+", " ", summary)
+    summary = _WHITESPACE.sub(" ", summary)
 
     # Split into sentences
-    sentences = re.split(r"(?<=[.!?])\s+", summary)
+    sentences = _SENTENCE_SPLIT.split(summary)
 
     # Keep first 1 or 2 full sentences
     selected = sentences[:2]
@@ -95,79 +134,87 @@ def simplify_claims(claims: list[dict]) -> list[dict]:
                     - "simplified_claim"
     """
 
-    simplified_results = []
+    items = []
 
     for item in claims:
-        claim_id = item.get("claim_id")
         original_claim = item.get("claim", "").strip()
 
-        if not original_claim:
-            continue
-
-        # ============================
-        # Step 1: Flan-T5 Simplification
-        # ============================
-        prompt = (
-            "Rewrite this claim as a clear, factual, readable sentence. "
-            "Add definitions for important entities in brackets:\n"
-            f"{original_claim}"
-        )
-
-        inputs = tokenizer(
-            prompt,
-            return_tensors="pt",
-            truncation=True,
-            max_length=256
-        ).to(DEVICE)
-
-        with torch.no_grad():
-            outputs = model.generate(
-                **inputs,
-                max_length=128,
-                num_beams=4,
-                early_stopping=True
-            )
-
-        simplified_text = tokenizer.decode(
-            outputs[0],
-            skip_special_tokens=True
-        ).strip()
+        if original_claim:
+            items.append((item.get("claim_id"), original_claim))
+
+    if not items:
+        return []
+
+    # ============================
+    # Step 1: Flan-T5 Simplification (batched)
+    # ============================
+    prompts = [
+        "Rewrite this claim as a clear, factual, readable sentence. "
+        "Add definitions for important entities in brackets:\n"
+        f"{original_claim}"
+        for _, original_claim in items
+    ]
+
+    simplified_texts = [text.strip() for text in generate_batch(prompts)]
+
+    # ============================
+    # Step 2: Named Entity Detection (batched)
+    # ============================
+    docs = nlp.pipe(simplified_texts, batch_size=NER_BATCH_SIZE)
+
+    # Unique entity strings per claim, in order of appearance
+    claim_entities = [
+        list(dict.fromkeys(
+            ent.text for ent in doc.ents if ent.label_ in ENTITY_LABELS
+        ))
+        for doc in docs
+    ]
+
+    # ============================
+    # Step 3: Wikipedia Definitions
+    # ============================
+    # Each entity is looked up once per call, however many claims mention
+    # it; lookups run concurrently (network-bound)
+    unique_entities = list(dict.fromkeys(
+        entity_text for entities in claim_entities for entity_text in entities
+    ))
+
+    entity_definitions = {}
+
+    if unique_entities:
+        with ThreadPoolExecutor(max_workers=WIKI_MAX_WORKERS) as executor:
+            entity_definitions = dict(zip(
+                unique_entities,
+                executor.map(_get_wikipedia_summary, unique_entities)
+            ))
 
-        # ============================
-        # Step 2: Named Entity Detection
-        # ============================
-        doc = nlp(simplified_text)
-
-        # Track replacements to avoid duplicates
-        entity_replacements = {}
-
-        for ent in doc.ents:
-            if ent.label_ in {
-                "PERSON",
-                "ORG",
-                "GPE",
-                "LOC",
-                "EVENT",
-                "WORK_OF_ART"
-            }:
-                entity_text = ent.text
-
-                if entity_text in entity_replacements:
-                    continue
+    simplified_results = []
 
-                definition = _get_wikipedia_summary(entity_text)
+    for (claim_id, original_claim), simplified_text, entities in zip(
+        items, simplified_texts, claim_entities
+    ):
 
-                if definition:
-                    replacement = f"{entity_text} ({definition})"
-                    entity_replacements[entity_text] = replacement
+        entity_replacements = {
+            entity_text: f"{entity_text} ({entity_definitions[entity_text]})"
+            for entity_text in entities
+            if entity_definitions[entity_text]
+        }
 
         # ============================
-        # Step 3: Replace Entities
+        # Step 4: Replace Entities
         # ============================
-        for entity, replacement in entity_replacements.items():
-            # Replace whole words only
-            pattern = r"\b" + re.escape(entity) + r"\b"
-            simplified_text = re.sub(pattern, replacement, simplified_text)
+        if entity_replacements:
+            # Whole words only, all entities in one pass (longest first,
+            # so "New York City" wins over "New York")
+            pattern = re.compile(r"\b(?:" + "|".join(
+                re.escape(entity)
+                for entity in sorted(entity_replacements, key=len, reverse=True)
+            ) + r")\b")
+
+            simplified_text = pattern.sub(
+                lambda match: entity_replacements[match.group(0)],
+                simplified_text
+            )
 
         simplified_results.append({
             "claim_id": claim_id,
@@ -1,7 +1,56 @@
+import asyncio
+import functools
+import hashlib
 import os
 import re
-import requests
+import threading
 from google import genai
+from google.genai import errors as genai_errors
+from transformers import AutoTokenizer, pipeline
+from _disk_cache import DiskCache, MISSING
+from _shared_t5 import DEVICE
+
+# ======================================================
+# MARKER MATCHING
+# ======================================================
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def _compile_markers(markers: list[str]) -> tuple[frozenset, re.Pattern | None]:
+    """
+    Split a marker list into single words, matched by set lookup against
+    the claim's tokens, and multi-word phrases, compiled into one
+    word-bounded alternation pattern.
+    """
+    words = frozenset(m for m in markers if " " not in m)
+    phrases = [m for m in markers if " " in m]
+
+    if not phrases:
+        return words, None
+
+    # Whole words only: "un report" must not match inside "run report"
+    alternation = "|".join(re.escape(p) for p in phrases)
+
+    return words, re.compile(rf"\b(?:{alternation})\b")
+
+
+def _tokenize(text: str) -> set[str]:
+    """
+    Word set of a lowercased claim. Markers match whole words only, so
+    "mission" no longer fires on "emissions" nor "cern" on "concern";
+    inflected forms worth matching are listed in the marker lists.
+    """
+    return set(_WORD_RE.findall(text))
+
+
+def _has_marker(text: str, tokens: set[str], markers: tuple) -> bool:
+    words, phrases = markers
+
+    if not words.isdisjoint(tokens):
+        return True
+
+    return phrases is not None and phrases.search(text) is not None
+
 
 # ======================================================
 # GEMINI SETUP (PRIMARY CLASSIFIER)
@@ -14,25 +63,45 @@ else:
     client = None
 
 
+# ======================================================
+# RESULT CACHES (IN-PROCESS LRU + DISK, 7 DAYS)
+# ======================================================
+API_CACHE_TTL = 7 * 86400
+
+_gemini_cache = DiskCache(".cache/gemini", ttl=API_CACHE_TTL, memory_size=4096)
+_zero_shot_cache = DiskCache(".cache/zero_shot", ttl=API_CACHE_TTL, memory_size=4096)
+
+
+# Case, spacing and trailing punctuation don't change the label
+_KEY_NOISE_RE = re.compile(r"[^\w\s]+$|^[^\w\s]+")
+_KEY_SPACE_RE = re.compile(r"\s+")
+
+
+def _cache_key(claim: str) -> str:
+    text = _KEY_SPACE_RE.sub(" ", claim.lower()).strip()
+    text = _KEY_NOISE_RE.sub("", text).strip()
+
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
 # ======================================================
 # GEMINI CLASSIFIER (DOMAIN-ROBUST PROMPT)
 # ======================================================
-def _gemini_debatable(claim: str) -> str | None:
-    """
-    Returns:
-        "debatable"
-        "non-debatable"
-        None if Gemini fails
-    """
+GEMINI_MODEL = "gemini-2.5-flash"
 
-    if not client:
-        print("⚠️ GEMINI_API_KEY not set.")
-        return None
+# Requests-per-minute quota of the API key; calls are paced under it
+GEMINI_QPM = 500
 
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=f"""
+# In-flight Gemini requests per batch (~8 per second at 500 QPM)
+GEMINI_MAX_CONCURRENCY = GEMINI_QPM // 60
+
+# Retries on 429, waiting GEMINI_BACKOFF * 2**attempt seconds
+GEMINI_MAX_RETRIES = 3
+GEMINI_BACKOFF = 1.0
+
+
+# Built once; only the claim is substituted per request
+_PROMPT_TEMPLATE = """
 You are a strict logical classifier.
 
 Your task is to classify the sentence as either:
@@ -94,66 +163,223 @@ non-debatable
 Sentence:
 "{claim}"
 """
-        )
 
-        if not response.text:
-            return None
 
-        answer = response.text.strip().lower()
+def _gemini_prompt(claim: str) -> str:
+    return _PROMPT_TEMPLATE.format(claim=claim)
 
-        if "non-debatable" in answer:
-            return "non-debatable"
-        if "debatable" in answer:
-            return "debatable"
 
+def _parse_gemini_answer(response) -> str | None:
+    if not response.text:
         return None
 
-    except Exception as e:
-        print("❌ Gemini exception:", e)
-        return None
+    answer = response.text.strip().lower()
+
+    if "non-debatable" in answer:
+        return "non-debatable"
+    if "debatable" in answer:
+        return "debatable"
+
+    return None
 
 
 # ======================================================
-# Hugging Face Zero-Shot Fallback
+# ASYNC GEMINI FAN-OUT
 # ======================================================
-HF_API_TOKEN = os.getenv("HF_API_TOKEN")
+# One long-lived event loop: the SDK's async HTTP client must not be
+# reused across the short-lived loops that asyncio.run() would create
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, daemon=True).start()
+
+
+def _run_async(coro):
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result()
 
-API_URL = "https://api-inference.huggingface.co/models/typeform/distilbert-base-uncased-mnli"
 
-HEADERS = {
-    "Authorization": f"Bearer {HF_API_TOKEN}"
-} if HF_API_TOKEN else {}
+class _RateLimiter:
+    """
+    Spaces request starts at least 60 / qpm seconds apart.
+    Only used from _LOOP, so no lock is needed.
+    """
 
+    def __init__(self, qpm: int):
+        self.interval = 60 / qpm
+        self._next_slot = 0.0
 
-def _zero_shot_debatable(claim: str) -> bool:
-    payload = {
-        "inputs": claim,
-        "parameters": {
-            "candidate_labels": [
-                "pure factual statement",
-                "claim that people can reasonably disagree about"
-            ]
-        }
-    }
+    async def acquire(self) -> None:
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
 
-    try:
-        response = requests.post(
-            API_URL,
-            headers=HEADERS,
-            json=payload,
-            timeout=15
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+_rate_limiter = _RateLimiter(GEMINI_QPM)
+
+
+async def _gemini_debatable_async(
+    claim: str,
+    semaphore: asyncio.Semaphore
+) -> str | None:
+
+    key = _cache_key(claim)
+
+    label = _gemini_cache.get(key)
+    if label is not MISSING or not client:
+        return None if label is MISSING else label
+
+    async with semaphore:
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            await _rate_limiter.acquire()
+
+            try:
+                response = await client.aio.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=_gemini_prompt(claim)
+                )
+
+                label = _parse_gemini_answer(response)
+                break
+
+            except genai_errors.APIError as e:
+                # 429: over quota, back off and try again
+                if e.code == 429 and attempt < GEMINI_MAX_RETRIES:
+                    await asyncio.sleep(GEMINI_BACKOFF * 2 ** attempt)
+                    continue
+
+                print("❌ Gemini exception:", e)
+                return None
+
+            except Exception as e:
+                print("❌ Gemini exception:", e)
+                return None
+
+    if label is not None:
+        _gemini_cache.set(key, label)
+
+    return label
+
+
+async def _gemini_debatable_batch(claims: list[str]) -> list[str | None]:
+    """
+    Classify claims with Gemini concurrently (cache hits skip the network).
+    Returns one label (or None on failure) per claim, in order.
+    """
+
+    if not client:
+        print("⚠️ GEMINI_API_KEY not set.")
+
+    semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+    return await asyncio.gather(*(
+        _gemini_debatable_async(claim, semaphore) for claim in claims
+    ))
+
+
+# ======================================================
+# LOCAL ZERO-SHOT FALLBACK (NLI)
+# ======================================================
+NLI_MODEL_NAME = "typeform/distilbert-base-uncased-mnli"
+
+# Optional ONNX Runtime export of NLI_MODEL_NAME (see README); unset = PyTorch
+NLI_ONNX_PATH = os.getenv("NLI_ONNX_PATH")
+
+ZERO_SHOT_LABELS = [
+    "pure factual statement",
+    "claim that people can reasonably disagree about"
+]
+
+# Claims per NLI forward pass
+ZERO_SHOT_BATCH_SIZE = 32
+
+
+@functools.lru_cache(maxsize=None)
+def _get_nli():
+    """
+    Load the zero-shot pipeline once per process, on first use;
+    most claims never reach this layer.
+
+    The first request that does reach it pays for loading the model,
+    and on a fresh machine for downloading it (~250 MB) into the
+    Hugging Face cache, so that request is noticeably slower.
+    """
+
+    tokenizer = AutoTokenizer.from_pretrained(NLI_MODEL_NAME)
+
+    if NLI_ONNX_PATH:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+
+        model = ORTModelForSequenceClassification.from_pretrained(
+            NLI_ONNX_PATH,
+            provider=(
+                "CUDAExecutionProvider" if DEVICE == "cuda"
+                else "CPUExecutionProvider"
+            )
         )
 
-        if response.status_code != 200:
-            return False
+        return pipeline(
+            "zero-shot-classification",
+            model=model,
+            tokenizer=tokenizer
+        )
+
+    return pipeline(
+        "zero-shot-classification",
+        model=NLI_MODEL_NAME,
+        tokenizer=tokenizer,
+        device=DEVICE
+    )
+
+
+def _zero_shot_debatable_batch(claims: list[str]) -> list[bool]:
+    """
+    Cached wrapper around _zero_shot_batch_uncached.
+    Failed runs count as "not debatable" but are not cached.
+    """
+
+    keys = [_cache_key(claim) for claim in claims]
+    results = [_zero_shot_cache.get(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is MISSING]
+
+    if pending:
+        resolved = _zero_shot_batch_uncached([claims[i] for i in pending])
+
+        for i, result in zip(pending, resolved):
+            if result is not None:
+                _zero_shot_cache.set(keys[i], result)
+
+            results[i] = result
+
+    return [bool(result) for result in results]
+
+
+def _zero_shot_batch_uncached(claims: list[str]) -> list[bool | None]:
+    """
+    Returns:
+        One True / False per claim from the local zero-shot classifier,
+        or None for every claim if inference fails
+    """
 
-        result = response.json()
-        labels = result.get("labels", [])
+    try:
+        outputs = _get_nli()(
+            claims,
+            candidate_labels=ZERO_SHOT_LABELS,
+            batch_size=ZERO_SHOT_BATCH_SIZE
+        )
 
-        return labels and "disagree" in labels[0].lower()
+        # A single input comes back as a bare dict
+        if isinstance(outputs, dict):
+            outputs = [outputs]
 
-    except Exception:
-        return False
+        return [
+            "disagree" in output["labels"][0].lower()
+            for output in outputs
+        ]
+
+    except Exception as e:
+        print("❌ Zero-shot exception:", e)
+        return [None] * len(claims)
 
 
 # ======================================================
@@ -172,53 +398,55 @@ AUTHORITATIVE_SOURCES = [
     "ministry of",
 ]
 
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+_AUTHORITATIVE = _compile_markers(AUTHORITATIVE_SOURCES)
 
-def _is_authoritative_fact(text: str) -> bool:
-    text = text.lower()
 
-    has_number = bool(re.search(r"\d+(\.\d+)?%?", text))
-    has_year = bool(re.search(r"\b(19|20)\d{2}\b", text))
-    has_source = any(src in text for src in AUTHORITATIVE_SOURCES)
+def _is_authoritative_fact(text_lower: str, tokens: set[str]) -> bool:
+    # A year is itself a number, so "number and year" reduces to "year"
+    if _YEAR_RE.search(text_lower):
+        return True
 
-    return (has_number and has_year) or has_source
+    return _has_marker(text_lower, tokens, _AUTHORITATIVE)
 
 
 # ======================================================
 # LAYER 2: SCIENTIFIC / MISSION CONTEXT PROTECTION
 # ======================================================
 SCIENTIFIC_CONTEXT_KEYWORDS = [
-    "rover",
+    "rover", "rovers",
     "nasa",
-    "mission",
+    "mission", "missions",
     "launched",
-    "explore",
+    "explore", "explores", "explored", "explorer", "explorers",
     "exploring",
-    "observatory",
-    "satellite",
-    "collider",
-    "experiment",
-    "study",
+    "observatory", "observatories",
+    "satellite", "satellites",
+    "collider", "colliders",
+    "experiment", "experiments", "experimental",
+    "study", "studies", "studied", "studying",
     "researchers at",
     "ipcc",
     "cern",
-    "laboratory",
-    "telescope",
+    "laboratory", "laboratories",
+    "telescope", "telescopes",
 ]
 
+_SCIENTIFIC = _compile_markers(SCIENTIFIC_CONTEXT_KEYWORDS)
 
-def _is_scientific_context(text: str) -> bool:
-    text = text.lower()
-    return any(keyword in text for keyword in SCIENTIFIC_CONTEXT_KEYWORDS)
+
+def _is_scientific_context(text_lower: str, tokens: set[str]) -> bool:
+    return _has_marker(text_lower, tokens, _SCIENTIFIC)
 
 
 # ======================================================
 # LAYER 3: ATTRIBUTION / STANCE
 # ======================================================
 ATTRIBUTION_MARKERS = [
-    "argue", "argues", "argued",
-    "claim", "claims",
-    "believe", "believes",
-    "critic", "critics",
+    "argue", "argues", "argued", "arguing",
+    "claim", "claims", "claimed", "claiming",
+    "believe", "believes", "believed",
+    "critic", "critics", "criticism", "criticize", "criticized",
     "supporter", "supporters",
     "experts say",
     "scientists say",
@@ -232,9 +460,12 @@ ATTRIBUTION_MARKERS = [
 # ======================================================
 MODAL_MARKERS = [
     "could", "may", "might", "likely", "unlikely",
-    "potential", "risk", "threat",
+    "potential", "potentially",
+    "risk", "risks", "risky",
+    "threat", "threats", "threaten", "threatens", "threatened",
     "expected to", "projected to",
-    "forecast", "estimate",
+    "forecast", "forecasts", "forecasted",
+    "estimate", "estimates", "estimated",
 ]
 
 
@@ -242,68 +473,112 @@ MODAL_MARKERS = [
 # LAYER 5: IMPACT / TRANSFORMATION LANGUAGE
 # ======================================================
 IMPACT_MARKERS = [
-    "revolutionize",
-    "transform",
+    "revolutionize", "revolutionizes", "revolutionized",
+    "transform", "transforms", "transformed", "transforming",
+    "transformation", "transformative",
     "change society",
-    "solve",
-    "destroy",
-    "reshape",
-    "disrupt",
-    "eliminate",
-    "replace",
+    "solve", "solves", "solved",
+    "destroy", "destroys", "destroyed", "destroying",
+    "reshape", "reshapes", "reshaped",
+    "disrupt", "disrupts", "disrupted", "disrupting", "disruption",
+    "eliminate", "eliminates", "eliminated",
+    "replace", "replaces", "replaced", "replacement",
 ]
 
+_IMPACT = _compile_markers(IMPACT_MARKERS)
+
+# Layers 3-5 all resolve to "debatable", so one lookup covers them
+_DEBATABLE = _compile_markers(
+    IMPACT_MARKERS + MODAL_MARKERS + ATTRIBUTION_MARKERS
+)
+
 
 # ======================================================
-# FINAL DECISION FUNCTION
+# RULE LAYERS (MARKER LOOKUPS, NO MODELS)
 # ======================================================
-def classify_claim_debatability(claim: str) -> str:
+def _rule_based_debatability(claim: str) -> str | None:
+    """
+    Returns:
+        "debatable" / "non-debatable" if a marker layer decides,
+        None if the claim needs model-based reasoning
+    """
 
     text = claim.lower()
+    tokens = _tokenize(text)
 
     # 1️⃣ Hard factual override
-    if _is_authoritative_fact(text):
+    if _is_authoritative_fact(text, tokens):
         return "non-debatable"
 
     # 2️⃣ Scientific mission / reporting protection
-    if _is_scientific_context(text) and not any(marker in text for marker in IMPACT_MARKERS):
+    if (
+        _is_scientific_context(text, tokens)
+        and not _has_marker(text, tokens, _IMPACT)
+    ):
         return "non-debatable"
 
-    # 3️⃣ Strong impact or prediction markers
-    if any(marker in text for marker in IMPACT_MARKERS):
+    # 3️⃣ Impact, modality or attribution markers
+    if _has_marker(text, tokens, _DEBATABLE):
         return "debatable"
 
-    if any(marker in text for marker in MODAL_MARKERS):
-        return "debatable"
+    return None
 
-    if any(marker in text for marker in ATTRIBUTION_MARKERS):
-        return "debatable"
 
-    # 4️⃣ Gemini primary reasoning
-    gemini_result = _gemini_debatable(claim)
-    if gemini_result:
-        return gemini_result
+# ======================================================
+# MODEL LAYERS (GEMINI API, THEN LOCAL ZERO-SHOT)
+# ======================================================
+def _model_debatability_batch(claims: list[str]) -> list[str]:
 
-    # 5️⃣ Zero-shot fallback
-    if _zero_shot_debatable(claim):
-        return "debatable"
+    if not claims:
+        return []
+
+    # 4️⃣ Gemini for all claims at once
+    labels = _run_async(_gemini_debatable_batch(claims))
+    fallback = [i for i, label in enumerate(labels) if not label]
+
+    # 5️⃣ One batched zero-shot pass for whatever Gemini could not label
+    if fallback:
+        resolved = _zero_shot_debatable_batch([claims[i] for i in fallback])
 
-    return "non-debatable"
+        for i, debatable in zip(fallback, resolved):
+            labels[i] = "debatable" if debatable else "non-debatable"
+
+    return labels
+
+
+# ======================================================
+# FINAL DECISION FUNCTION
+# ======================================================
+def classify_claim_debatability(claim: str) -> str:
+    return (
+        _rule_based_debatability(claim)
+        or _model_debatability_batch([claim])[0]
+    )
 
 
 # ======================================================
 # MODULE INTERFACE (UI COMPATIBLE)
 # ======================================================
 def classify_debatability(claims: list[dict]) -> list[dict]:
-    results = []
+    items = []
 
     for item in claims:
         claim_text = item.get("claim", "").strip()
-        if not claim_text:
-            continue
+        if claim_text:
+            items.append((item, claim_text))
 
-        label = classify_claim_debatability(claim_text)
+    # Marker rules first; only inconclusive claims go to the models
+    labels = [_rule_based_debatability(claim_text) for _, claim_text in items]
+    pending = [i for i, label in enumerate(labels) if label is None]
+
+    resolved = _model_debatability_batch([items[i][1] for i in pending])
+
+    for i, label in zip(pending, resolved):
+        labels[i] = label
+
+    results = []
 
+    for (item, claim_text), label in zip(items, labels):
         results.append({
             "claim_id": item.get("claim_id"),
             "claim": claim_text,
@@ -311,4 +586,4 @@ def classify_debatability(claims: list[dict]) -> list[dict]:
             "label": label
         })
 
-    return results
\ No newline at end of file
+    return results
@@ -1,10 +1,13 @@
+import os
 import requests
 import re
-import time
-import random
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup, SoupStrainer
 from ddgs import DDGS
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
+from _disk_cache import DiskCache, MISSING
 
 # ======================================================
 # CONFIG
@@ -13,49 +16,101 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0"
 }
 
+CONNECT_TIMEOUT = 3.05
 TIMEOUT = 10
 MAX_RETRIES = 2
 MAX_WEBSITES = 6
 
+# Only HTML is parsed, and at most MAX_PAGE_BYTES of it
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml")
+MAX_PAGE_BYTES = 2_000_000
+
+# Concurrent page downloads per retrieve_evidence_chunks() call
+FETCH_MAX_WORKERS = 16
+
+# Keep-alive session: reuses TCP/TLS connections across fetches
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=MAX_RETRIES,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504]
+    )
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+# Optional Serper.dev search API: batched queries, and result snippets
+# often make page downloads unnecessary (unset = DDGS)
+SERPER_API_KEY = os.getenv("SERPER_API_KEY")
+SERPER_URL = "https://google.serper.dev/search"
+
+# Snippets this long count as evidence; with MIN_SNIPPET_CHUNKS of them
+# a claim's pages are not fetched at all
+MIN_SNIPPET_CHARS = 120
+MIN_SNIPPET_CHUNKS = 4
+
+# Parsed page paragraphs and search results persist across runs for a day
+WEB_CACHE_TTL = 86400
+_page_cache = DiskCache(
+    ".cache/pages",
+    ttl=WEB_CACHE_TTL,
+    memory_size=256,
+    max_entries=2000
+)
+_search_cache = DiskCache(".cache/search", ttl=WEB_CACHE_TTL, memory_size=1024)
+
+# ======================================================
+# PRECOMPILED PATTERNS
+# ======================================================
+_WS_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+_SENT_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+
 # ======================================================
 # CLEAN TEXT
 # ======================================================
 def _clean_text(text: str) -> str:
-    return re.sub(r"\s+", " ", text).strip()
+    return _WS_RE.sub(" ", text).strip()
 
 
 # ======================================================
 # URL FILTERING
 # ======================================================
-BLOCKED_EXTENSIONS = [".pdf", ".ppt", ".doc"]
-BLOCKED_DOMAINS = ["researchgate.net", "sciencedirect.com", "academia.edu"]
+BLOCKED_EXTENSIONS = frozenset([".pdf", ".ppt", ".pptx", ".doc", ".docx"])
+BLOCKED_DOMAINS = frozenset(["researchgate.net", "sciencedirect.com", "academia.edu"])
 
 def _is_valid_url(url: str) -> bool:
     if not url:
         return False
 
-    url_lower = url.lower()
-
-    if "bing.com/aclick" in url_lower:
+    try:
+        parts = urlsplit(url)
+    except ValueError:
         return False
 
-    if any(ext in url_lower for ext in BLOCKED_EXTENSIONS):
+    host = (parts.hostname or "").casefold()
+    if not host:
         return False
 
-    if any(domain in url_lower for domain in BLOCKED_DOMAINS):
+    # Ad redirects
+    is_bing = host == "bing.com" or host.endswith(".bing.com")
+    if is_bing and parts.path.startswith("/aclick"):
         return False
 
-    return True
+    # The host itself or any parent domain (covers www. and other subdomains)
+    labels = host.split(".")
+    if any(".".join(labels[i:]) in BLOCKED_DOMAINS for i in range(len(labels))):
+        return False
 
+    if os.path.splitext(parts.path)[1].casefold() in BLOCKED_EXTENSIONS:
+        return False
 
-# ======================================================
-# DOMAIN
-# ======================================================
-def _get_domain(url: str) -> str:
-    try:
-        return urlparse(url).netloc
-    except:
-        return ""
+    return True
 
 
 # ======================================================
@@ -69,18 +124,28 @@ ARGUMENT_KEYWORDS = [
     "replace","automation","jobs","employment"
 ]
 
-def _arg_score(text: str) -> int:
-    t = text.lower()
-    return sum(1 for w in ARGUMENT_KEYWORDS if w in t)
+# One alternation per keyword list: a single scan instead of one per keyword
+def _compile_keywords(keywords: list[str]) -> re.Pattern:
+    ordered = sorted(keywords, key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in ordered))
+
+
+_ARG_RE = _compile_keywords(ARGUMENT_KEYWORDS)
+
+
+def _arg_score(text_lower: str) -> int:
+    return len(set(_ARG_RE.findall(text_lower)))
 
 
 # ======================================================
 # RELEVANCE (RELAXED 🔥)
 # ======================================================
-def _relevance_score(claim: str, text: str) -> int:
-    c = set(re.findall(r"\w+", claim.lower()))
-    t = set(re.findall(r"\w+", text.lower()))
-    return len(c.intersection(t))
+def _claim_words(claim: str) -> set[str]:
+    return set(_WORD_RE.findall(claim.lower()))
+
+
+def _relevance_score(claim_words: set[str], text_lower: str) -> int:
+    return len(claim_words.intersection(_WORD_RE.findall(text_lower)))
 
 
 # ======================================================
@@ -91,22 +156,49 @@ BAD_PATTERNS = [
     "click here","free trial","apply now"
 ]
 
-def _is_bad_content(text: str) -> bool:
-    t = text.lower()
-    return any(p in t for p in BAD_PATTERNS)
+_BAD_RE = _compile_keywords(BAD_PATTERNS)
+
+
+def _is_bad_content(text_lower: str) -> bool:
+    return _BAD_RE.search(text_lower) is not None
 
 
 # ======================================================
 # FETCH PAGE
 # ======================================================
 def _fetch_page(url: str):
-    for _ in range(MAX_RETRIES):
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
-            if r.status_code == 200:
-                return r.text
-        except:
-            time.sleep(1)
+    try:
+        with _SESSION.get(
+            url,
+            timeout=(CONNECT_TIMEOUT, TIMEOUT),
+            stream=True
+        ) as r:
+
+            if r.status_code != 200:
+                return None
+
+            # Decide from the headers before downloading the body
+            content_type = r.headers.get("content-type", "text/html").lower()
+            if not content_type.lstrip().startswith(HTML_CONTENT_TYPES):
+                return None
+
+            length = r.headers.get("content-length", "")
+            if length.isdigit() and int(length) > MAX_PAGE_BYTES:
+                return None
+
+            # Raw bytes: lxml sniffs the charset itself
+            body = bytearray()
+
+            for chunk in r.iter_content(chunk_size=64 * 1024):
+                body += chunk
+
+                if len(body) >= MAX_PAGE_BYTES:
+                    break
+
+            return bytes(body[:MAX_PAGE_BYTES])
+
+    except:
+        pass
     return None
 
 
@@ -141,48 +233,111 @@ def _merge_sentences(sentences, max_len=450):
 # ======================================================
 # CHUNK SCORING 🔥🔥🔥
 # ======================================================
-def _score_chunk(claim, text):
-    rel = _relevance_score(claim, text)
-    arg = _arg_score(text)
+def _score_chunk(claim_words, text):
+    text_lower = text.lower()
+    rel = _relevance_score(claim_words, text_lower)
+    arg = _arg_score(text_lower)
     length_bonus = min(len(text) / 200, 1)
 
     return rel * 0.5 + arg * 0.4 + length_bonus
 
 
 # ======================================================
-# EXTRACTION (IMPROVED)
+# PAGE PARAGRAPHS (CLAIM-INDEPENDENT, CACHED)
 # ======================================================
-def _extract_chunks(url: str, claim: str, max_chunks: int = 6):
+_PARAGRAPHS = SoupStrainer("p")
+
+
+def _page_paragraphs(url: str) -> list[str] | None:
+    """
+    Cached wrapper around _fetch_paragraphs.
+    Failed fetches (None) are not cached, so they are retried next run.
+    """
+
+    cached = _page_cache.get(url)
+    if cached is not MISSING:
+        return cached
+
+    paragraphs = _fetch_paragraphs(url)
+
+    if paragraphs is not None:
+        _page_cache.set(url, paragraphs)
+
+    return paragraphs
+
+
+def _fetch_paragraphs(url: str) -> list[str] | None:
+    """
+    Download a page and parse it (see _parse_html).
+    Returns None if the page could not be fetched or parsed.
+    """
 
     html = _fetch_page(url)
     if not html:
-        return []
+        return None
+
+    # Parsed in the calling fetch thread, so one page's parse overlaps
+    # with the other threads' downloads
+    return _parse_html(html)
+
+
+def _parse_html(html: bytes) -> list[str] | None:
+    """
+    Parse a page into cleaned, non-boilerplate paragraphs.
+    """
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        # Only <p> subtrees are ever read, so only build those
+        soup = BeautifulSoup(html, "lxml", parse_only=_PARAGRAPHS)
 
         for tag in soup(["script","style","noscript"]):
             tag.decompose()
 
-        paragraphs = soup.find_all("p")
-
-        sentences = []
+        paragraphs = []
 
-        for p in paragraphs:
+        for p in soup.find_all("p"):
 
             text = _clean_text(p.get_text())
 
             if len(text) < 80:
                 continue
 
-            if _is_bad_content(text):
+            if _is_bad_content(text.lower()):
                 continue
 
+            paragraphs.append(text)
+
+        return paragraphs
+
+    except:
+        return None
+
+
+# ======================================================
+# EXTRACTION (IMPROVED)
+# ======================================================
+def _extract_chunks(paragraphs: list[str] | None, claim: str, max_chunks: int = 6):
+
+    if not paragraphs:
+        return []
+
+    try:
+        # Tokenize the claim once, not once per paragraph and chunk
+        claim_words = _claim_words(claim)
+        sentences = []
+
+        for text in paragraphs:
+
             # relaxed filtering 🔥
-            if _relevance_score(claim, text) < 1 and _arg_score(text) == 0:
+            text_lower = text.lower()
+
+            if (
+                _relevance_score(claim_words, text_lower) < 1
+                and _arg_score(text_lower) == 0
+            ):
                 continue
 
-            sents = re.split(r"(?<=[.!?])\s+", text)
+            sents = _SENT_SPLIT_RE.split(text)
 
             for s in sents:
                 s = s.strip()
@@ -196,7 +351,7 @@ def _extract_chunks(url: str, claim: str, max_chunks: int = 6):
         merged = _merge_sentences(sentences)
 
         # 🔥 score + sort
-        scored = [(c, _score_chunk(claim, c)) for c in merged]
+        scored = [(c, _score_chunk(claim_words, c)) for c in merged]
         scored.sort(key=lambda x: x[1], reverse=True)
 
         # 🔥 deduplicate
@@ -220,9 +375,82 @@ def _extract_chunks(url: str, claim: str, max_chunks: int = 6):
 
 
 # ======================================================
-# SEARCH
+# SEARCH (CACHED, BATCHED)
 # ======================================================
-def _search_web(query: str, max_results: int = 8):
+def _search_web(queries: list[str], max_results: int = 8) -> list[list[dict]]:
+    """
+    Cached search for several queries, one result list per query.
+    With SERPER_API_KEY set, all cache misses go out in one Serper
+    request; otherwise DDGS is queried once per miss.
+    Empty result lists are not cached; they usually mean a failed search.
+    """
+
+    provider = "serper" if SERPER_API_KEY else "ddgs"
+    keys = [f"{provider}:{max_results}:{q.strip().lower()}" for q in queries]
+
+    results = [_search_cache.get(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is MISSING]
+
+    if pending:
+        pending_queries = [queries[i] for i in pending]
+
+        if SERPER_API_KEY:
+            fetched = _run_serper_search(pending_queries, max_results)
+        else:
+            fetched = [_run_search(q, max_results) for q in pending_queries]
+
+        for i, result in zip(pending, fetched):
+            if result:
+                _search_cache.set(keys[i], result)
+
+            results[i] = result
+
+    return results
+
+
+def _run_serper_search(queries: list[str], max_results: int = 8) -> list[list[dict]]:
+
+    failed = [[] for _ in queries]
+
+    payload = [{"q": q, "num": max_results} for q in queries]
+
+    try:
+        response = _SESSION.post(
+            SERPER_URL,
+            json=payload,
+            headers={"X-API-KEY": SERPER_API_KEY},
+            timeout=(CONNECT_TIMEOUT, TIMEOUT)
+        )
+
+        if response.status_code != 200:
+            return failed
+
+        data = response.json()
+
+        # A single query comes back as a bare object
+        if isinstance(data, dict):
+            data = [data]
+
+        if len(data) != len(queries):
+            return failed
+
+        return [
+            [
+                {
+                    "title": r.get("title"),
+                    "url": r.get("link"),
+                    "snippet": r.get("snippet", "")
+                }
+                for r in d.get("organic", [])[:max_results]
+            ]
+            for d in data
+        ]
+
+    except:
+        return failed
+
+
+def _run_search(query: str, max_results: int = 8):
 
     results = []
 
@@ -242,60 +470,138 @@ def _search_web(query: str, max_results: int = 8):
 # ======================================================
 # MAIN MODULE 4
 # ======================================================
-def retrieve_evidence_chunks(claims: list[dict]) -> list[dict]:
+def _select_urls(search_results: list[dict]) -> list[dict]:
+    """
+    Pick the first MAX_WEBSITES valid, unique results.
+    """
 
-    enriched_results = []
+    selected = []
+    seen_urls = set()
 
-    for item in claims:
+    for result in search_results:
 
-        claim_text = item.get("simplified_claim") or item.get("claim", "")
-        label = item.get("label", "")
+        if len(selected) >= MAX_WEBSITES:
+            break
+
+        url = result.get("url")
 
-        evidence_chunks = []
-        seen_urls = set()
+        if not _is_valid_url(url):
+            continue
 
-        if label == "debatable":
+        if url in seen_urls:
+            continue
 
-            queries = [
-                f"{claim_text} pros cons",
-                f"{claim_text} arguments for against",
-                f"{claim_text} impact jobs",
-                f"{claim_text} debate"
-            ]
+        seen_urls.add(url)
+        selected.append(result)
 
-            search_results = []
+    return selected
 
-            for q in queries:
-                search_results.extend(_search_web(q, max_results=5))
 
-            website_count = 0
+def _snippet_chunks(search_results: list[dict]) -> list[dict]:
+    """
+    Evidence chunks taken straight from search snippets long enough
+    to stand on their own (only Serper results carry snippets).
+    """
 
-            for result in search_results:
+    chunks = []
+    seen_urls = set()
 
-                if website_count >= MAX_WEBSITES:
-                    break
+    for result in search_results:
 
-                url = result.get("url")
+        if len(chunks) >= MAX_WEBSITES:
+            break
 
-                if not _is_valid_url(url):
-                    continue
+        url = result.get("url")
+        snippet = _clean_text(result.get("snippet") or "")
 
-                if url in seen_urls:
-                    continue
+        if len(snippet) < MIN_SNIPPET_CHARS:
+            continue
+
+        if not _is_valid_url(url) or url in seen_urls:
+            continue
+
+        if _is_bad_content(snippet.lower()):
+            continue
+
+        seen_urls.add(url)
+        chunks.append({
+            "source": result.get("title"),
+            "url": url,
+            "content": snippet
+        })
+
+    return chunks
 
-                seen_urls.add(url)
-                website_count += 1
 
-                chunks = _extract_chunks(url, claim_text)
+def retrieve_evidence_chunks(claims: list[dict]) -> list[dict]:
+
+    # 1️⃣ Search for every debatable claim first
+    snippets_by_claim = {}
+    selected_by_claim = {}
+
+    for idx, item in enumerate(claims):
+
+        claim_text = item.get("simplified_claim") or item.get("claim", "")
+
+        if item.get("label", "") != "debatable":
+            continue
+
+        queries = [
+            f"{claim_text} pros cons",
+            f"{claim_text} arguments for against",
+            f"{claim_text} impact jobs",
+            f"{claim_text} debate"
+        ]
+
+        search_results = [
+            result
+            for results in _search_web(queries, max_results=5)
+            for result in results
+        ]
+
+        snippets_by_claim[idx] = _snippet_chunks(search_results)
+
+        # Enough snippet evidence: skip downloading pages for this claim
+        if len(snippets_by_claim[idx]) < MIN_SNIPPET_CHUNKS:
+            selected_by_claim[idx] = _select_urls(search_results)
+
+    # 2️⃣ Fetch each URL once, however many claims it serves
+    unique_urls = list(dict.fromkeys(
+        result["url"]
+        for selected in selected_by_claim.values()
+        for result in selected
+    ))
+
+    paragraphs_by_url = {}
+
+    if unique_urls:
+        with ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS) as executor:
+            paragraphs_by_url = dict(zip(
+                unique_urls,
+                executor.map(_page_paragraphs, unique_urls)
+            ))
+
+    # 3️⃣ Rank each claim's chunks from the shared pages
+    enriched_results = []
+
+    for idx, item in enumerate(claims):
+
+        claim_text = item.get("simplified_claim") or item.get("claim", "")
+        label = item.get("label", "")
+
+        evidence_chunks = list(snippets_by_claim.get(idx, []))
 
-                for c in chunks:
-                    evidence_chunks.append({
-                        "source": result.get("title"),
-                        "url": url,
-                        "content": c
-                    })
+        for result in selected_by_claim.get(idx, []):
 
-                time.sleep(random.uniform(0.5, 1.0))
+            url = result["url"]
+            chunks = _extract_chunks(paragraphs_by_url.get(url), claim_text)
+
+            for c in chunks:
+                evidence_chunks.append({
+                    "source": result.get("title"),
+                    "url": url,
+                    "content": c
+                })
 
         enriched_results.append({
             "claim_id": item.get("claim_id"),
@@ -304,4 +610,4 @@ def retrieve_evidence_chunks(claims: list[dict]) -> list[dict]:
             "evidence_chunks": evidence_chunks
         })
 
-    return enriched_results
\ No newline at end of file
+    return enriched_results
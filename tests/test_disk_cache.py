@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from _disk_cache import DiskCache, MISSING
+
+
+class DiskCacheThreadTest(unittest.TestCase):
+    """
+    The caches are shared by ThreadPoolExecutor workers, so values written
+    from one thread must be readable, and persisted, from any other.
+    """
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "cache", "store")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _run_in_thread(self, fn, *args):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(fn, *args).result()
+
+    def test_set_in_worker_get_in_main(self):
+        cache = DiskCache(self.path, ttl=60)
+
+        self._run_in_thread(cache.set, "key", "value")
+
+        self.assertEqual(cache.get("key"), "value")
+        cache.close()
+
+    def test_set_in_main_persists_for_other_thread(self):
+        cache = DiskCache(self.path, ttl=60)
+        cache.set("key", ["a", "b"])
+        cache.close()
+
+        reopened = DiskCache(self.path, ttl=60)
+
+        self.assertEqual(self._run_in_thread(reopened.get, "key"), ["a", "b"])
+        reopened.close()
+
+    def test_many_threads_share_one_instance(self):
+        cache = DiskCache(self.path, ttl=60)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda i: cache.set(str(i), i), range(100)))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            values = list(executor.map(cache.get, [str(i) for i in range(100)]))
+
+        self.assertEqual(values, list(range(100)))
+        cache.close()
+
+    def test_expired_entry_is_a_miss(self):
+        cache = DiskCache(self.path, ttl=-1)
+        cache.set("key", "value")
+
+        self.assertIs(self._run_in_thread(cache.get, "key"), MISSING)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()